@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException, Depends, status, Request
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -10,16 +11,21 @@ from presidio_analyzer import AnalyzerEngine
 from presidio_anonymizer import AnonymizerEngine
 from presidio_anonymizer.entities import OperatorConfig
 from config import settings
+import asyncio
+import copy
 import hashlib
 import time
 import logging
+import operator
 import secrets
 import re
-import subprocess
-import sys
-import signal
+import importlib.util
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
-from langdetect import detect, detect_langs, LangDetectException
+from langdetect import DetectorFactory, detect, detect_langs, LangDetectException
+from langdetect.detector_factory import init_factory
 
 # Configure minimal logging
 if settings.ENABLE_LOGGING:
@@ -30,74 +36,23 @@ if settings.ENABLE_LOGGING:
 else:
     logger = None
 
-# Helper: Check if spaCy model is installed
-def is_spacy_model_installed(model_name: str) -> bool:
-    """Check if a spaCy model is installed."""
-    try:
-        import spacy
-        spacy.load(model_name)
-        return True
-    except OSError:
-        return False
-
-# Helper: Install spaCy model
-def install_spacy_model(model_name: str) -> bool:
-    """Install a spaCy model using subprocess with security validation."""
-    # Security: Only allow whitelisted model names
-    ALLOWED_MODELS = {
-        "en_core_web_lg", 
-        "de_core_news_lg",
-        "en_core_web_sm",
-        "de_core_news_sm"
-    }
-    
-    if model_name not in ALLOWED_MODELS:
-        print(f"✗ Security error: Model '{model_name}' not in allowed list")
-        return False
-    
-    # Additional security: validate model name format (alphanumeric and underscores only)
-    if not re.match(r'^[a-zA-Z0-9_]+$', model_name):
-        print(f"✗ Security error: Invalid model name format '{model_name}'")
-        return False
-    
-    try:
-        print(f"Installing spaCy model: {model_name}")
-        result = subprocess.run([
-            sys.executable, "-m", "spacy", "download", model_name
-        ], capture_output=True, text=True, timeout=300)  # 5 minute timeout
-        
-        if result.returncode == 0:
-            print(f"✓ Successfully installed {model_name}")
-            return True
-        else:
-            print(f"✗ Failed to install {model_name}: {result.stderr}")
-            return False
-    except subprocess.TimeoutExpired:
-        print(f"✗ Timeout installing {model_name}")
-        return False
-    except Exception as e:
-        print(f"✗ Error installing {model_name}: {str(e)}")
-        return False
-
 # Helper: Ensure required spaCy models are installed
 def ensure_spacy_models():
-    """Ensure all required spaCy models are installed."""
-    required_models = {
-        "en": "en_core_web_lg",
-        "de": "de_core_news_lg"
-    }
-    
-    print("Checking required spaCy models...")
-    
-    for lang, model_name in required_models.items():
-        if not is_spacy_model_installed(model_name):
-            print(f"Model {model_name} not found. Installing...")
-            if not install_spacy_model(model_name):
-                print(f"WARNING: Failed to install {model_name}. {lang} language support may not work properly.")
-        else:
-            print(f"✓ Model {model_name} is already installed")
+    """
+    Fail fast if a required spaCy model is missing.
     
-    print("spaCy model check completed.")
+    Models are installed ahead of time (python -m spacy download <model>),
+    never by the serving process, so worker startup stays fast.
+    """
+    missing = [
+        model_name for model_name in settings.SPACY_MODELS.values()
+        if importlib.util.find_spec(model_name) is None
+    ]
+    if missing:
+        raise RuntimeError(
+            f"Missing spaCy models: {', '.join(missing)}. "
+            f"Install them with: python -m spacy download <model_name>"
+        )
 
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -105,7 +60,8 @@ limiter = Limiter(key_func=get_remote_address)
 app = FastAPI(
     title="Presidio PII Scrubber API",
     description="Lightweight API for PII detection and masking using Microsoft Presidio",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # orjson serializes large entity lists much faster
 )
 
 # Add rate limiter to app
@@ -132,19 +88,28 @@ from presidio_analyzer.nlp_engine import NlpEngineProvider
 configuration = {
     "nlp_engine_name": "spacy",
     "models": [
-        {"lang_code": "en", "model_name": "en_core_web_lg"},
-        {"lang_code": "de", "model_name": "de_core_news_lg"}
+        {"lang_code": lang_code, "model_name": model_name}
+        for lang_code, model_name in settings.SPACY_MODELS.items()
     ]
 }
 
 # Create NLP engine provider
 provider = NlpEngineProvider(nlp_configuration=configuration)
 
-# Initialize analyzers with the provider
-analyzers = {
-    "en": AnalyzerEngine(nlp_engine=provider.create_engine()),
-    "de": AnalyzerEngine(nlp_engine=provider.create_engine(), supported_languages=["de"])
-}
+nlp_engine = provider.create_engine()
+
+# Presidio only uses tokens, lemmas and named entities from spaCy, so skip
+# the dependency parser - it is a large share of each forward pass
+for nlp in nlp_engine.nlp.values():
+    if "parser" in nlp.pipe_names:
+        nlp.disable_pipe("parser")
+
+# Initialize one analyzer for all languages; the NLP engine holds a spaCy
+# pipeline per language and the language is selected per analyze() call
+analyzer = AnalyzerEngine(
+    nlp_engine=nlp_engine,
+    supported_languages=list(settings.SPACY_MODELS)
+)
 anonymizer = AnonymizerEngine()
 
 # Language code mapping for detection
@@ -159,6 +124,12 @@ LANGUAGE_MAP = {
 # Initialize Basic Auth
 security = HTTPBasic(auto_error=False)
 
+# SHA256 digests of the configured credentials, computed once. Incoming
+# credentials are hashed the same way, so the constant-time comparison is
+# always between two 32-byte values regardless of credential length
+_API_USERNAME_DIGEST = hashlib.sha256((settings.API_USERNAME or "").encode("utf8")).digest()
+_API_PASSWORD_DIGEST = hashlib.sha256((settings.API_PASSWORD or "").encode("utf8")).digest()
+
 def get_current_user(credentials: Optional[HTTPBasicCredentials] = Depends(security)):
     """Verify basic authentication credentials if auth is enabled."""
     if not settings.ENABLE_AUTH:
@@ -183,12 +154,12 @@ def get_current_user(credentials: Optional[HTTPBasicCredentials] = Depends(secur
             logger.warning("Weak password configured - consider using a stronger password")
     
     is_correct_username = secrets.compare_digest(
-        credentials.username.encode("utf8"),
-        settings.API_USERNAME.encode("utf8")
+        hashlib.sha256(credentials.username.encode("utf8")).digest(),
+        _API_USERNAME_DIGEST
     )
     is_correct_password = secrets.compare_digest(
-        credentials.password.encode("utf8"),
-        settings.API_PASSWORD.encode("utf8")
+        hashlib.sha256(credentials.password.encode("utf8")).digest(),
+        _API_PASSWORD_DIGEST
     )
     
     if not (is_correct_username and is_correct_password):
@@ -206,9 +177,8 @@ def get_current_user(credentials: Optional[HTTPBasicCredentials] = Depends(secur
     
     return credentials.username
 
-# Request schema
-class MaskRequest(BaseModel):
-    text: str
+# Request schemas
+class MaskOptions(BaseModel):
     mode: Optional[str] = "mask"  # "detect" for entity names only, "mask" for actual masking
     masking_mode: Optional[str] = None  # replace, redact, hash
     masking_char: Optional[str] = None
@@ -217,19 +187,176 @@ class MaskRequest(BaseModel):
     language: Optional[str] = None  # Explicitly specify language (en, de) or auto-detect if None
     enable_preprocessing: Optional[bool] = None  # Override default preprocessing setting
 
-# Response schema
+class MaskRequest(MaskOptions):
+    text: str
+
+class MaskBatchRequest(MaskOptions):
+    texts: List[str]  # All texts share the same masking options
+
+# Response schemas
 class MaskResponse(BaseModel):
     masked_text: str
     entities_found: List[Dict[str, Any]]
     processing_time_ms: float
     detected_language: Optional[str] = None
 
-# Helper: Timeout context manager for DoS protection
+class MaskBatchResponse(BaseModel):
+    results: List[MaskResponse]  # One result per input text, in request order
+    processing_time_ms: float
+
+# Helper: Raised when analysis exceeds MAX_PROCESSING_TIME (DoS protection)
 class TimeoutException(Exception):
     pass
 
-def timeout_handler(signum, frame):
-    raise TimeoutException("Processing timeout exceeded")
+# Helper: coalesce concurrent analyze calls into batched NLP passes
+class AnalyzerBatcher:
+    """
+    Collect analyze requests that arrive within a short window and run the
+    spaCy pipeline over them with one nlp.pipe() call per language.
+    
+    spaCy has a large fixed cost per call, so concurrent requests are
+    cheaper to process together than one at a time. Batches run on a
+    dedicated thread pool so the event loop keeps accepting requests
+    meanwhile, and a stuck batch can never starve the shared thread pool
+    that language detection and other handlers rely on.
+    """
+    
+    def __init__(self, max_batch_size: int, max_wait_ms: int, max_workers: int):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending = []
+        self._flush_handle = None
+        self._running = set()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analyzer")
+    
+    async def analyze(self, text: str, language: str, entities: Optional[List[str]] = None):
+        """Queue text for analysis and wait for its batch to be processed."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, language, entities, future))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        # Keep a reference so the task is not garbage collected mid-run
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+    
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            # Set processing timeout as DoS protection. A running worker
+            # thread cannot be interrupted, but waiting requests are released
+            # and a batch still queued behind it is cancelled before it starts.
+            # Stuck batches only hold the analyzer's own threads.
+            await asyncio.wait_for(
+                loop.run_in_executor(self._executor, self._process, batch, loop),
+                timeout=settings.MAX_PROCESSING_TIME
+            )
+            return
+        except asyncio.TimeoutError:
+            error = TimeoutException("Processing timeout exceeded")
+        except Exception as e:
+            error = e
+        
+        # Fail only the requests that had not been answered yet
+        for _, _, _, future in batch:
+            self._resolve(future, error)
+    
+    @staticmethod
+    def _resolve(future, outcome):
+        # Skip requests whose client has gone away (or already answered)
+        if future.done():
+            return
+        if isinstance(outcome, Exception):
+            future.set_exception(outcome)
+        else:
+            future.set_result(outcome)
+    
+    def _process(self, batch, loop):
+        """
+        Analyze a batch, answering each request as soon as its own analysis
+        finishes, so a slow text does not hold back the rest of the batch.
+        """
+        by_language = {}
+        for index, (_, language, _, _) in enumerate(batch):
+            by_language.setdefault(language, []).append(index)
+        
+        for language, indices in by_language.items():
+            texts = [batch[index][0] for index in indices]
+            artifacts = nlp_engine.process_batch(texts, language=language, batch_size=len(texts))
+            
+            for index, (_, nlp_artifacts) in zip(indices, artifacts):
+                text, _, entities, future = batch[index]
+                try:
+                    outcome = analyzer.analyze(
+                        text=text,
+                        entities=entities,
+                        language=language,
+                        nlp_artifacts=nlp_artifacts
+                    )
+                except Exception as e:
+                    outcome = e
+                loop.call_soon_threadsafe(self._resolve, future, outcome)
+
+batcher = AnalyzerBatcher(
+    max_batch_size=settings.ANALYZER_BATCH_SIZE,
+    max_wait_ms=settings.ANALYZER_BATCH_WAIT_MS,
+    max_workers=settings.ANALYZER_THREADS
+)
+
+# Analyzer results keyed by (text digest, language, entities). Only entity
+# types, offsets and scores are kept - never the text itself
+_analysis_cache: Dict[tuple, tuple] = {}
+
+# Helper: analyze text, reusing cached results for repeated payloads
+async def analyze_text(text: str, language: str, entities: Optional[List[str]] = None):
+    """
+    Analyze text through the batcher. With ENABLE_RESPONSE_CACHE, identical
+    requests (e.g. retried webhooks) skip the NLP pipeline entirely.
+    """
+    if not settings.ENABLE_RESPONSE_CACHE:
+        return await batcher.analyze(text, language, entities)
+    
+    key = (
+        hashlib.blake2b(text.encode(), digest_size=16).digest(),
+        language,
+        tuple(entities) if entities else None
+    )
+    cached = _analysis_cache.get(key)
+    if cached is None:
+        results = await batcher.analyze(text, language, entities)
+        if len(_analysis_cache) >= settings.RESPONSE_CACHE_SIZE:
+            # Evict the least recently used entry
+            del _analysis_cache[next(iter(_analysis_cache))]
+        _analysis_cache[key] = tuple(copy.copy(r) for r in results)
+        return results
+    
+    # Move the hit to the end so often-retried payloads stay cached
+    _analysis_cache[key] = _analysis_cache.pop(key)
+    
+    # Hand out copies so the anonymizer never sees shared result objects
+    return [copy.copy(r) for r in cached]
+
+# Escape sequences (\\n, \\t) and whitespace, collapsed together by preprocess_text
+_PREPROCESS_RE = re.compile(r'(?:\\[nt]|\s)+')
+# Anything preprocess_text would change: an escape sequence, whitespace other
+# than a single space, a double space, or leading/trailing space
+_NEEDS_PREPROCESSING_RE = re.compile(r'\\[nt]|[^\S ]|  |^ | $')
 
 # Helper: preprocess text to improve PII recognition
 def preprocess_text(text: str) -> str:
@@ -251,16 +378,51 @@ def preprocess_text(text: str) -> str:
     if not text:
         return text
     
-    # Convert escape sequences to actual characters
-    processed = text.replace('\\n', ' ').replace('\\t', ' ')
-    
-    # Normalize multiple whitespace characters to single spaces
-    processed = re.sub(r'\s+', ' ', processed)
+    # Fast path: already clean text (the common JSON case) is returned as-is
+    if not _NEEDS_PREPROCESSING_RE.search(text):
+        return text
     
-    # Remove leading/trailing whitespace
-    processed = processed.strip()
+    # Convert escape sequences and runs of whitespace to single spaces in one
+    # pass, then remove leading/trailing whitespace
+    return _PREPROCESS_RE.sub(' ', text).strip()
+
+# Make langdetect deterministic so cached and fresh detections agree
+DetectorFactory.seed = 0
+# Load the language profiles now, on the main thread. langdetect loads them
+# lazily without a lock, and detection runs in worker threads
+init_factory()
+
+# Language detection results keyed by a digest of the text, so repeated
+# payloads skip langdetect without keeping raw text in memory
+LANGUAGE_CACHE_SIZE = 1024
+_language_cache: Dict[bytes, Optional[str]] = {}
+_language_cache_lock = threading.Lock()
+# Cache miss marker - None is a valid cached result (detection failed)
+_MISSING = object()
+
+def _detect_raw_language(text: str) -> Optional[str]:
+    """Run langdetect on text, memoized by content digest."""
+    key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+    # Detection runs in worker threads and a hit reorders the cache, so
+    # look up and refresh under the lock
+    with _language_cache_lock:
+        cached = _language_cache.pop(key, _MISSING)
+        if cached is not _MISSING:
+            # Move the hit to the end so often-seen texts stay cached
+            _language_cache[key] = cached
+            return cached
     
-    return processed
+    try:
+        detected = detect(text)
+    except LangDetectException:
+        detected = None
+    
+    with _language_cache_lock:
+        if len(_language_cache) >= LANGUAGE_CACHE_SIZE:
+            # Evict the least recently used entry
+            del _language_cache[next(iter(_language_cache))]
+        _language_cache[key] = detected
+    return detected
 
 # Helper: detect language of text
 def detect_text_language(text: str, fallback: str = "en") -> str:
@@ -268,51 +430,64 @@ def detect_text_language(text: str, fallback: str = "en") -> str:
     Detect the language of the input text.
     Returns ISO 639-1 language code (en, de).
     """
-    try:
-        # Try to detect language
-        detected = detect(text)
-        
-        # Map detected language to supported languages
-        if detected in LANGUAGE_MAP:
-            lang = LANGUAGE_MAP[detected]
-            if lang in settings.SUPPORTED_LANGUAGES:
-                return lang
-        
-        # If detected language is not supported, return fallback
-        return fallback
-    except LangDetectException:
-        # If detection fails, return fallback
-        return fallback
+    # Try to detect language
+    detected = _detect_raw_language(text)
+    
+    # Map detected language to supported languages
+    if detected in LANGUAGE_MAP:
+        lang = LANGUAGE_MAP[detected]
+        if lang in settings.SUPPORTED_LANGUAGES:
+            return lang
+    
+    # If detection failed or the language is not supported, return fallback
+    return fallback
+
+# Helper: hash an entity value for the custom "hash" operator
+def _blake2b_12(value: str) -> str:
+    """Return a short, stable BLAKE2b digest (12 hex chars) for an entity value."""
+    return hashlib.blake2b(value.encode(), digest_size=6).hexdigest()
+
+# Shared operator configs - they only depend on a tiny set of inputs,
+# so build each one once instead of on every analyzer result
+_HASH_CFG = OperatorConfig("custom", {"lambda": _blake2b_12})
+
+def _replace_cfg(entity_type: str) -> OperatorConfig:
+    return OperatorConfig("replace", {"new_value": f"<{entity_type}>"})
+
+# Replace operators for every entity type the analyzer can report, built at
+# startup so the request path only does lookups. Unknown types (none in
+# practice) get a fresh config
+REPLACE_OPERATORS: Dict[str, OperatorConfig] = {
+    entity_type: _replace_cfg(entity_type)
+    for language in analyzer.supported_languages
+    for entity_type in analyzer.get_supported_entities(language=language)
+}
+
+@lru_cache(maxsize=256)
+def _redact_cfg(masking_char: str) -> OperatorConfig:
+    return OperatorConfig("replace", {"new_value": masking_char * 6})
 
 # Helper: build anonymization config
 def build_anonymizer_config(masking_mode: str, masking_char: str, results):
     """
     Build anonymizer configuration based on masking mode.
-    For consistent hashing within a request, we'll use entity value as salt.
+    Operators are keyed by entity type, so each unique type is resolved once.
     """
-    operators = {}
-    
-    for result in results:
-        entity_type = result.entity_type
-        
-        if masking_mode == "replace":
-            operators[entity_type] = OperatorConfig(
-                "replace",
-                {"new_value": f"<{entity_type}>"}
-            )
-        elif masking_mode == "redact":
-            operators[entity_type] = OperatorConfig(
-                "replace",
-                {"new_value": masking_char * 6}
-            )
-        elif masking_mode == "hash":
-            # For consistent hashing, we use SHA256
-            operators[entity_type] = OperatorConfig(
-                "custom",
-                {"lambda": lambda x: hashlib.sha256(x.encode()).hexdigest()[:12]}
-            )
-    
-    return operators
+    entity_types = {r.entity_type for r in results}
+    
+    if masking_mode == "replace":
+        return {
+            entity_type: REPLACE_OPERATORS.get(entity_type) or _replace_cfg(entity_type)
+            for entity_type in entity_types
+        }
+    elif masking_mode == "redact":
+        # The redaction string does not depend on the entity type
+        return dict.fromkeys(entity_types, _redact_cfg(masking_char))
+    elif masking_mode == "hash":
+        # For consistent hashing, we use BLAKE2b
+        return dict.fromkeys(entity_types, _HASH_CFG)
+    
+    return {}
 
 @app.get("/health")
 @limiter.limit("60/minute")  # Allow frequent health checks
@@ -320,23 +495,55 @@ async def health_check(request: Request):
     """Health check endpoint for monitoring."""
     return {"status": "healthy", "service": "pii-scrubber"}
 
-@app.post("/mask", response_model=MaskResponse)
-@limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")  # Configurable rate limiting
-async def mask_text(
-    request: Request,
-    req: MaskRequest,
-    current_user: str = Depends(get_current_user)
-):
+# Helper: build operators for the "hash" masking mode
+def build_hash_operators(text: str, results) -> Dict[str, OperatorConfig]:
     """
-    Main endpoint for PII detection and masking.
+    Hash each distinct span once. Operators are keyed by entity type, so the
+    last span of each type determines the hash used for that type.
+    """
+    encoded = text.encode("utf-8")
+    # For pure ASCII text character offsets equal byte offsets, so spans are
+    # hashed straight from the encoded buffer without per-entity copies
+    view = memoryview(encoded) if len(encoded) == len(text) else None
     
-    Accepts text and masking configuration, returns masked text
-    with metadata about detected entities.
+    span_digests = {}
+    entity_digests = {}
+    for result in results:
+        if view is not None:
+            span = view[result.start:result.end]
+        else:
+            span = text[result.start:result.end].encode("utf-8")
+        digest = span_digests.get(span)
+        if digest is None:
+            digest = span_digests[span] = hashlib.blake2b(span, digest_size=4).hexdigest()
+        entity_digests[result.entity_type] = digest
+    
+    return {
+        entity_type: OperatorConfig("replace", {"new_value": f"<HASH:{digest}>"})
+        for entity_type, digest in entity_digests.items()
+    }
+
+# Fields reported for each entity, fetched with one C-level call per result
+_ENTITY_FIELDS = operator.attrgetter("entity_type", "start", "end", "score")
+
+# Helper: format analyzer results for the response
+def format_entities(results) -> List[Dict[str, Any]]:
+    """Convert analyzer results into the entities_found response format."""
+    return [
+        {"entity_type": entity_type, "start": start, "end": end, "score": round(score, 3)}
+        for entity_type, start, end, score in map(_ENTITY_FIELDS, results)
+    ]
+
+# Helper: detect and mask PII in a single text
+async def process_text(text: str, req: MaskOptions) -> MaskResponse:
+    """
+    Validate, analyze and (optionally) mask one text using the options
+    from a /mask or /mask_batch request.
     """
     start_time = time.time()
     
     # Enhanced DoS protection: Check request size
-    request_size = len(req.text.encode('utf-8')) if req.text else 0
+    request_size = len(text.encode('utf-8')) if text else 0
     if request_size > settings.MAX_REQUEST_SIZE:
         raise HTTPException(
             status_code=413,
@@ -344,25 +551,25 @@ async def mask_text(
         )
     
     # Validate input
-    if not req.text:
+    if not text:
         raise HTTPException(status_code=400, detail="Missing text in request body")
     
-    if len(req.text) > settings.MAX_TEXT_SIZE:
+    if len(text) > settings.MAX_TEXT_SIZE:
         raise HTTPException(
             status_code=413, 
             detail=f"Text too large. Maximum size is {settings.MAX_TEXT_SIZE} characters"
         )
     
     # Apply text preprocessing if enabled
-    original_text = req.text
+    original_text = text
     preprocessing_enabled = req.enable_preprocessing if req.enable_preprocessing is not None else settings.ENABLE_PREPROCESSING
     
     if preprocessing_enabled:
-        processed_text = preprocess_text(req.text)
+        processed_text = preprocess_text(text)
         if logger:
             logger.info(f"Text preprocessing applied: original_length={len(original_text)}, processed_length={len(processed_text)}")
     else:
-        processed_text = req.text
+        processed_text = text
     
     # Validate mode
     if req.mode not in ["detect", "mask"]:
@@ -375,6 +582,13 @@ async def mask_text(
     masking_mode = req.masking_mode or settings.MASKING_MODE
     masking_char = req.masking_char or settings.MASKING_CHAR
     
+    # The redaction string is cached per masking_char, so keep it short
+    if len(masking_char) > 4:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid masking_char. Must be at most 4 characters"
+        )
+    
     # Validate masking mode (only if in mask mode)
     if req.mode == "mask" and masking_mode not in ["replace", "redact", "hash"]:
         raise HTTPException(
@@ -392,36 +606,29 @@ async def mask_text(
             )
         detected_language = req.language
     elif settings.AUTO_DETECT_LANGUAGE:
-        # Auto-detect language using processed text for better accuracy
-        detected_language = detect_text_language(processed_text, settings.DEFAULT_LANGUAGE)
+        # Auto-detect language using processed text for better accuracy.
+        # langdetect is CPU-bound, so keep it off the event loop
+        detected_language = await run_in_threadpool(
+            detect_text_language, processed_text, settings.DEFAULT_LANGUAGE
+        )
     else:
         # Use default language
         detected_language = settings.DEFAULT_LANGUAGE
     
-    # Get the appropriate analyzer for the detected language
-    if detected_language not in analyzers:
+    # Make sure the analyzer is configured for the detected language
+    if detected_language not in analyzer.supported_languages:
         raise HTTPException(
             status_code=500,
             detail=f"Analyzer not configured for language: {detected_language}"
         )
     
-    analyzer = analyzers[detected_language]
-    
     try:
-        # Set processing timeout as DoS protection
-        signal.signal(signal.SIGALRM, timeout_handler)
-        signal.alarm(settings.MAX_PROCESSING_TIME)
-        
-        try:
-            # Analyze processed text for PII
-            analysis_results = analyzer.analyze(
-                text=processed_text,
-                entities=req.entities,
-                language=detected_language
-            )
-        finally:
-            # Always clear the alarm
-            signal.alarm(0)
+        # Analyze processed text for PII (batched with concurrent requests)
+        analysis_results = await analyze_text(
+            processed_text,
+            detected_language,
+            req.entities
+        )
         
         # DoS protection: Check for excessive entities
         if len(analysis_results) > settings.MAX_ENTITIES_PER_REQUEST:
@@ -451,15 +658,7 @@ async def mask_text(
             # Prepare response with original text
             response = MaskResponse(
                 masked_text=original_text,  # Return original text in detect mode
-                entities_found=[
-                    {
-                        "entity_type": r.entity_type,
-                        "start": r.start,
-                        "end": r.end,
-                        "score": round(r.score, 3)
-                    }
-                    for r in analysis_results
-                ],
+                entities_found=format_entities(analysis_results),
                 processing_time_ms=elapsed_ms,
                 detected_language=detected_language
             )
@@ -468,13 +667,7 @@ async def mask_text(
             # Build anonymizer configuration
             if masking_mode == "hash":
                 # For hash mode, use custom operators
-                operators = {}
-                for result in analysis_results:
-                    entity_type = result.entity_type
-                    operators[entity_type] = OperatorConfig(
-                        "replace",
-                        {"new_value": f"<HASH:{hashlib.sha256(processed_text[result.start:result.end].encode()).hexdigest()[:8]}>"}
-                    )
+                operators = build_hash_operators(processed_text, analysis_results)
             else:
                 operators = build_anonymizer_config(masking_mode, masking_char, analysis_results)
             
@@ -495,21 +688,15 @@ async def mask_text(
             # Prepare response
             response = MaskResponse(
                 masked_text=anonymized_result.text,
-                entities_found=[
-                    {
-                        "entity_type": r.entity_type,
-                        "start": r.start,
-                        "end": r.end,
-                        "score": round(r.score, 3)
-                    }
-                    for r in analysis_results
-                ],
+                entities_found=format_entities(analysis_results),
                 processing_time_ms=elapsed_ms,
                 detected_language=detected_language
             )
         
         return response
     
+    except HTTPException:
+        raise
     except TimeoutException:
         if logger:
             logger.warning(f"Processing timeout exceeded: {settings.MAX_PROCESSING_TIME}s")
@@ -522,6 +709,97 @@ async def mask_text(
             logger.error(f"Processing error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal processing error")
 
+@app.post("/mask", response_model=MaskResponse)
+@limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")  # Configurable rate limiting
+async def mask_text(
+    request: Request,
+    req: MaskRequest,
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Main endpoint for PII detection and masking.
+    
+    Accepts text and masking configuration, returns masked text
+    with metadata about detected entities.
+    """
+    return await process_text(req.text, req)
+
+@app.post("/mask_batch", response_model=MaskBatchResponse)
+@limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")  # Configurable rate limiting
+async def mask_batch(
+    request: Request,
+    req: MaskBatchRequest,
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Batch endpoint for PII detection and masking.
+    
+    Accepts a list of texts sharing one masking configuration and returns
+    one result per text, in order. The texts are analyzed together, so
+    spaCy runs once per language instead of once per text.
+    """
+    start_time = time.time()
+    
+    # Validate input
+    if not req.texts:
+        raise HTTPException(status_code=400, detail="Missing texts in request body")
+    
+    if len(req.texts) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large. Maximum is {settings.MAX_BATCH_SIZE} texts"
+        )
+    
+    # Validate every text before any analysis starts, so a bad text never
+    # leaves the others running
+    for index, text in enumerate(req.texts):
+        if not text:
+            raise HTTPException(status_code=400, detail=f"Text {index}: Missing text")
+        if len(text) > settings.MAX_TEXT_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Text {index}: Text too large. Maximum size is {settings.MAX_TEXT_SIZE} characters"
+            )
+    
+    # DoS protection: the size limits apply to the batch as a whole, since
+    # one batch counts as a single request for rate limiting
+    request_size = sum(len(text.encode('utf-8')) for text in req.texts)
+    if request_size > settings.MAX_REQUEST_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Request too large. Maximum size is {settings.MAX_REQUEST_SIZE} bytes"
+        )
+    
+    if sum(map(len, req.texts)) > settings.MAX_BATCH_TEXT_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch text too large. Maximum total size is {settings.MAX_BATCH_TEXT_SIZE} characters"
+        )
+    
+    # All texts reach the analyzer batcher together and share NLP passes
+    outcomes = await asyncio.gather(
+        *(process_text(text, req) for text in req.texts),
+        return_exceptions=True
+    )
+    
+    # Report the first failing text by its index
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, HTTPException):
+            raise HTTPException(
+                status_code=outcome.status_code,
+                detail=f"Text {index}: {outcome.detail}"
+            )
+        if isinstance(outcome, Exception):
+            raise outcome
+    
+    elapsed_ms = round((time.time() - start_time) * 1000, 2)
+    
+    # Log metadata only (no sensitive data)
+    if logger:
+        logger.info(f"Processed batch: texts={len(req.texts)}, time={elapsed_ms}ms")
+    
+    return MaskBatchResponse(results=outcomes, processing_time_ms=elapsed_ms)
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Global exception handler to prevent sensitive data leakage."""
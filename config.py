@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional, List
+from typing import Optional, List, Dict
 import os
 
 class Settings(BaseSettings):
@@ -17,6 +17,10 @@ class Settings(BaseSettings):
     SUPPORTED_LANGUAGES: List[str] = ["en", "de"]  # English and German
     DEFAULT_LANGUAGE: str = "en"  # Default to English if detection fails
     AUTO_DETECT_LANGUAGE: bool = True  # Enable automatic language detection
+    # spaCy model per language. The *_lg models are the most accurate; the
+    # *_sm models (en_core_web_sm, de_core_news_sm) need a fraction of the
+    # memory and load much faster - validate detection quality before switching
+    SPACY_MODELS: Dict[str, str] = {"en": "en_core_web_lg", "de": "de_core_news_lg"}
     
     # Text preprocessing settings
     ENABLE_PREPROCESSING: bool = True  # Enable text preprocessing to improve PII detection
@@ -41,6 +45,15 @@ class Settings(BaseSettings):
     MAX_PROCESSING_TIME: int = 30  # Maximum processing time in seconds
     MAX_ENTITIES_PER_REQUEST: int = 100  # Maximum number of entities to process
     MAX_REQUEST_SIZE: int = 1_000_000  # 1MB max request size in bytes
+    MAX_BATCH_SIZE: int = 100  # Maximum number of texts per /mask_batch request
+    MAX_BATCH_TEXT_SIZE: int = 200_000  # Maximum total characters per /mask_batch request
+    
+    # Performance settings
+    ANALYZER_BATCH_SIZE: int = 32  # Max concurrent texts analyzed in one NLP pass
+    ANALYZER_BATCH_WAIT_MS: int = 5  # How long to wait for more texts before running a batch
+    ANALYZER_THREADS: int = 4  # Threads reserved for analyzer batches (caps in-flight batches)
+    ENABLE_RESPONSE_CACHE: bool = False  # Reuse analyzer results for repeated texts
+    RESPONSE_CACHE_SIZE: int = 4096  # Max cached analyses (stores digests and offsets, not text)
     
 
 settings = Settings()
\ No newline at end of file
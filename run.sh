@@ -18,12 +18,19 @@ source venv/bin/activate
 echo "Installing dependencies..."
 pip install -q -r requirements.txt
 
-# Download spacy model if not present
+# Download spacy models if not present (the server does not install them)
 echo "Checking NLP models..."
-python -c "import spacy; spacy.load('en_core_web_lg')" 2>/dev/null || {
-    echo "Downloading language model..."
-    python -m spacy download en_core_web_lg
+# Models come from SPACY_MODELS (config.py / .env), so only the configured ones are fetched
+MODELS=$(python -c "from config import settings; print(' '.join(settings.SPACY_MODELS.values()))") || {
+    echo "Could not read SPACY_MODELS from config"
+    exit 1
 }
+for model in $MODELS; do
+    python -c "import $model" 2>/dev/null || {
+        echo "Downloading language model $model..."
+        python -m spacy download $model
+    }
+done
 
 # Start the API
 echo "=========================================="
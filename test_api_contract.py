@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Contract tests for PII Scrubber API
+Runs the app in-process with FastAPI's TestClient, so no server is needed.
+Entity detection is stubbed with a fixed table, which keeps the checks on
+the response shapes, masking and error handling deterministic.
+End-to-end behaviour with the real NLP models is covered by test_api_integration.py
+"""
+
+from fastapi.testclient import TestClient
+from presidio_analyzer import RecognizerResult
+
+import app
+from app import MaskBatchResponse, MaskResponse, get_current_user
+
+# Entities the stubbed analyzer "detects" wherever they appear in a text
+FAKE_ENTITIES = {
+    "Jane Doe": "PERSON",
+    "Peter Meier": "PERSON",
+    "jane.doe@company.org": "EMAIL_ADDRESS",
+}
+
+async def fake_analyze(text, language, entities=None):
+    """Stand-in for AnalyzerBatcher.analyze that finds FAKE_ENTITIES by substring"""
+    results = []
+    for value, entity_type in FAKE_ENTITIES.items():
+        start = text.find(value)
+        if start != -1 and (not entities or entity_type in entities):
+            results.append(RecognizerResult(entity_type, start, start + len(value), 0.85))
+    return results
+
+app.batcher.analyze = fake_analyze
+app.app.dependency_overrides[get_current_user] = lambda: "contract-tests"
+CLIENT = TestClient(app.app)
+
+def test_mask_response():
+    """Test /mask replace mode against the MaskResponse schema"""
+    payload = {
+        "text": "Please contact Jane Doe at jane.doe@company.org",
+        "masking_mode": "replace",
+        "language": "en"
+    }
+    
+    response = CLIENT.post("/mask", json=payload)
+    assert response.status_code == 200
+    result = MaskResponse(**response.json())
+    
+    print("Mask Response Test:")
+    print(f"  Masked: {result.masked_text}")
+    print(f"  Entities: {[e['entity_type'] for e in result.entities_found]}")
+    
+    assert result.masked_text == "Please contact <PERSON> at <EMAIL_ADDRESS>"
+    assert result.detected_language == "en"
+    assert all(entity.keys() == {'entity_type', 'start', 'end', 'score'} for entity in result.entities_found)
+    print("✓ Mask response test passed\n")
+
+def test_detect_mode():
+    """Test that detect mode reports entities but returns the text unchanged"""
+    text = "Please contact Jane Doe"
+    
+    response = CLIENT.post("/mask", json={"text": text, "mode": "detect", "language": "en"})
+    assert response.status_code == 200
+    result = MaskResponse(**response.json())
+    
+    assert result.masked_text == text
+    assert result.entities_found == [{"entity_type": "PERSON", "start": 15, "end": 23, "score": 0.85}]
+    print("✓ Detect mode test passed\n")
+
+def test_hash_non_ascii():
+    """Test hash mode on non-ASCII text, where character and byte offsets differ"""
+    text = "Die Karte gehört zu Herrn Peter Meier."
+    
+    response = CLIENT.post("/mask", json={"text": text, "masking_mode": "hash", "language": "de"})
+    assert response.status_code == 200
+    result = MaskResponse(**response.json())
+    
+    print("Hash Non-ASCII Test:")
+    print(f"  Masked: {result.masked_text}")
+    
+    assert result.masked_text.startswith("Die Karte gehört zu Herrn <HASH:")
+    assert result.masked_text.endswith(">.")
+    print("✓ Hash non-ASCII test passed\n")
+
+def test_batch_response():
+    """Test /mask_batch against the MaskBatchResponse schema"""
+    texts = ["Please contact Jane Doe", "No PII here", "Mail jane.doe@company.org"]
+    
+    response = CLIENT.post("/mask_batch", json={"texts": texts, "masking_mode": "replace", "language": "en"})
+    assert response.status_code == 200
+    result = MaskBatchResponse(**response.json())
+    
+    print("Batch Response Test:")
+    for item in result.results:
+        print(f"  Masked: {item.masked_text}")
+    
+    assert [item.masked_text for item in result.results] == [
+        "Please contact <PERSON>",
+        "No PII here",
+        "Mail <EMAIL_ADDRESS>",
+    ]
+    print("✓ Batch response test passed\n")
+
+def test_error_handling():
+    """Test validation errors and their status codes"""
+    cases = [
+        ("/mask", {"text": ""}, 400, "Missing text"),
+        ("/mask", {"text": "test", "masking_mode": "invalid"}, 400, "Invalid masking_mode"),
+        ("/mask", {"text": "test", "mode": "invalid"}, 400, "Invalid mode"),
+        ("/mask", {"text": "test", "masking_char": "#####"}, 400, "Invalid masking_char"),
+        ("/mask", {"text": "test", "language": "xx"}, 400, "Unsupported language"),
+        ("/mask", {"text": "a" * (app.settings.MAX_TEXT_SIZE + 1)}, 413, "Text too large"),
+        ("/mask_batch", {"texts": []}, 400, "Missing texts"),
+        ("/mask_batch", {"texts": ["ok", ""]}, 400, "Text 1: Missing text"),
+        ("/mask_batch", {"texts": ["ok"] * (app.settings.MAX_BATCH_SIZE + 1)}, 413, "Batch too large"),
+    ]
+    
+    for path, payload, status, detail in cases:
+        response = CLIENT.post(path, json=payload)
+        assert response.status_code == status, f"{path} {detail}: got {response.status_code}"
+        assert response.json()["detail"].startswith(detail), response.json()["detail"]
+        print(f"✓ {path} {status} ({detail}) passed")
+    
+    print("")
+
+def main():
+    """Run all contract tests"""
+    print("="*50)
+    print("PII Scrubber API Contract Tests")
+    print("="*50)
+    print()
+    
+    test_mask_response()
+    test_detect_mode()
+    test_hash_non_ascii()
+    test_batch_response()
+    test_error_handling()
+    
+    print("="*50)
+    print("✅ All contract tests passed!")
+    print("="*50)
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,24 @@
 #!/usr/bin/env python3
 """
-Test script for PII Scrubber API
+End-to-end tests for PII Scrubber API
 Run this after starting the API server
+In-process contract tests with a stubbed analyzer live in test_api_contract.py
 """
 
 import requests
-import json
+from test_utils import ensure_healthy, make_session, rjson, warm_up
 
 # API endpoint
 BASE_URL = "http://localhost:8000"
 
+# Shared session so requests reuse pooled keep-alive connections
+SESSION = make_session()
+
 def test_health():
     """Test health check endpoint"""
-    response = requests.get(f"{BASE_URL}/health")
-    print("Health Check:", response.json())
+    response = SESSION.get(f"{BASE_URL}/health")
     assert response.status_code == 200
+    print("Health Check:", rjson(response))
     print("✓ Health check passed\n")
 
 def test_basic_masking():
@@ -24,8 +28,9 @@ def test_basic_masking():
         "masking_mode": "replace"
     }
     
-    response = requests.post(f"{BASE_URL}/mask", json=payload)
-    result = response.json()
+    response = SESSION.post(f"{BASE_URL}/mask", json=payload)
+    assert response.status_code == 200
+    result = rjson(response)
     
     print("Basic Masking Test:")
     print(f"  Original: {payload['text']}")
@@ -33,7 +38,6 @@ def test_basic_masking():
     print(f"  Entities found: {len(result['entities_found'])}")
     print(f"  Processing time: {result['processing_time_ms']}ms")
     
-    assert response.status_code == 200
     assert "<PERSON>" in result['masked_text']
     assert "<EMAIL_ADDRESS>" in result['masked_text']
     print("✓ Basic masking passed\n")
@@ -46,14 +50,14 @@ def test_redact_mode():
         "masking_char": "*"
     }
     
-    response = requests.post(f"{BASE_URL}/mask", json=payload)
-    result = response.json()
+    response = SESSION.post(f"{BASE_URL}/mask", json=payload)
+    assert response.status_code == 200
+    result = rjson(response)
     
     print("Redact Mode Test:")
     print(f"  Original: {payload['text']}")
     print(f"  Masked: {result['masked_text']}")
     
-    assert response.status_code == 200
     assert "******" in result['masked_text']
     print("✓ Redact mode passed\n")
 
@@ -64,14 +68,14 @@ def test_hash_mode():
         "masking_mode": "hash"
     }
     
-    response = requests.post(f"{BASE_URL}/mask", json=payload)
-    result = response.json()
+    response = SESSION.post(f"{BASE_URL}/mask", json=payload)
+    assert response.status_code == 200
+    result = rjson(response)
     
     print("Hash Mode Test:")
     print(f"  Original: {payload['text']}")
     print(f"  Masked: {result['masked_text']}")
     
-    assert response.status_code == 200
     assert "<HASH:" in result['masked_text']
     print("✓ Hash mode passed\n")
 
@@ -83,15 +87,15 @@ def test_specific_entities():
         "skip_entities": ["DATE_TIME"]
     }
     
-    response = requests.post(f"{BASE_URL}/mask", json=payload)
-    result = response.json()
+    response = SESSION.post(f"{BASE_URL}/mask", json=payload)
+    assert response.status_code == 200
+    result = rjson(response)
     
     print("Specific Entities Test:")
     print(f"  Original: {payload['text']}")
     print(f"  Masked: {result['masked_text']}")
     print(f"  Detected entities: {[e['entity_type'] for e in result['entities_found']]}")
     
-    assert response.status_code == 200
     # Date should not be masked since it's in skip_entities
     assert "01/15/1990" in result['masked_text'] or "DATE" not in [e['entity_type'] for e in result['entities_found']]
     print("✓ Specific entities test passed\n")
@@ -111,15 +115,15 @@ def test_complex_text():
         "masking_mode": "replace"
     }
     
-    response = requests.post(f"{BASE_URL}/mask", json=payload)
-    result = response.json()
+    response = SESSION.post(f"{BASE_URL}/mask", json=payload)
+    assert response.status_code == 200
+    result = rjson(response)
     
     print("Complex Text Test:")
     print(f"  Entities found: {len(result['entities_found'])}")
     for entity in result['entities_found']:
         print(f"    - {entity['entity_type']}: score {entity['score']}")
     
-    assert response.status_code == 200
     assert len(result['entities_found']) > 3
     print("✓ Complex text test passed\n")
 
@@ -131,12 +135,13 @@ def test_n8n_format():
         "masking_mode": "replace"
     }
     
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/mask",
         json=payload,
         headers={"Content-Type": "application/json"}
     )
-    result = response.json()
+    assert response.status_code == 200
+    result = rjson(response)
     
     print("N8N Format Test:")
     print(f"  Request format: JSON")
@@ -144,19 +149,18 @@ def test_n8n_format():
     print(f"  Response has entities_found: {'entities_found' in result}")
     print(f"  Response has processing_time_ms: {'processing_time_ms' in result}")
     
-    assert response.status_code == 200
     assert all(key in result for key in ['masked_text', 'entities_found', 'processing_time_ms'])
     print("✓ N8N format test passed\n")
 
 def test_error_handling():
     """Test error handling"""
     # Test with empty text
-    response = requests.post(f"{BASE_URL}/mask", json={"text": ""})
+    response = SESSION.post(f"{BASE_URL}/mask", json={"text": ""})
     assert response.status_code == 400
     print("✓ Empty text handling passed")
     
     # Test with invalid masking mode
-    response = requests.post(f"{BASE_URL}/mask", json={
+    response = SESSION.post(f"{BASE_URL}/mask", json={
         "text": "test",
         "masking_mode": "invalid"
     })
@@ -165,9 +169,20 @@ def test_error_handling():
     
     print("")
 
-if __name__ == "__main__":
+def main():
+    """Run all API tests"""
+    # Fail fast if the server is not running
+    try:
+        ensure_healthy(SESSION, BASE_URL)
+    except requests.RequestException:
+        print(f"❌ Error: Cannot connect to API at {BASE_URL}")
+        print("   Please start the API server first:")
+        print("   uvicorn app:app --reload --host 0.0.0.0 --port 8000")
+        return
+    warm_up(SESSION, BASE_URL)
+    
     print("="*50)
-    print("PII Scrubber API Test Suite")
+    print("PII Scrubber API Integration Tests")
     print("="*50)
     print()
     
@@ -187,10 +202,11 @@ if __name__ == "__main__":
         print("="*50)
         
     except requests.exceptions.ConnectionError:
-        print("❌ Error: Cannot connect to API at http://localhost:8000")
-        print("   Please start the API server first:")
-        print("   uvicorn app:app --reload --host 0.0.0.0 --port 8000")
+        print(f"❌ Error: Lost connection to API at {BASE_URL}")
     except Exception as e:
         print(f"❌ Test failed: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,28 @@
 #!/usr/bin/env python3
 import requests
-import base64
+from requests.auth import HTTPBasicAuth
+import sys
+from test_utils import ensure_healthy, make_session, rjson, warm_up
 
 # Test server URL
 BASE_URL = "http://localhost:8000"
 
+# Shared session so requests reuse pooled keep-alive connections
+SESSION = make_session()
+
+# Separate session for the authenticated probe (update these based on your .env)
+AUTH_SESSION = make_session(pool_size=1)
+AUTH_SESSION.auth = HTTPBasicAuth("admin", "secure_password_here")
+
+# Fail fast if the server is not running
+try:
+    ensure_healthy(SESSION, BASE_URL)
+except requests.RequestException:
+    print(f"❌ Error: Cannot connect to API at {BASE_URL}")
+    print("   Please start the API server first: uvicorn app:app --reload")
+    sys.exit(1)
+warm_up(AUTH_SESSION, BASE_URL)
+
 # Test text
 test_text = "John Smith's email is john.smith@example.com"
 
@@ -14,7 +32,7 @@ print("=" * 50)
 # Test 1: Without authentication (should work if auth is disabled)
 print("\n1. Testing without authentication:")
 try:
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/mask",
         json={"text": test_text, "mode": "detect"}
     )
@@ -30,7 +48,7 @@ except Exception as e:
 # Test 2: With incorrect credentials
 print("\n2. Testing with incorrect credentials:")
 try:
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/mask",
         json={"text": test_text, "mode": "detect"},
         auth=("wrong_user", "wrong_pass")
@@ -47,13 +65,12 @@ except Exception as e:
 # Test 3: With correct credentials (update these based on your .env)
 print("\n3. Testing with correct credentials (admin/secure_password_here):")
 try:
-    response = requests.post(
+    response = AUTH_SESSION.post(
         f"{BASE_URL}/mask",
-        json={"text": test_text, "mode": "detect"},
-        auth=("admin", "secure_password_here")
+        json={"text": test_text, "mode": "detect"}
     )
     if response.status_code == 200:
-        result = response.json()
+        result = rjson(response)
         print("   ✓ Authentication successful")
         print(f"   Entities found: {len(result['entities_found'])}")
     elif response.status_code == 401:
@@ -66,14 +83,17 @@ except Exception as e:
 # Test 4: Health endpoint (usually no auth required)
 print("\n4. Testing health endpoint:")
 try:
-    response = requests.get(f"{BASE_URL}/health")
+    response = SESSION.get(f"{BASE_URL}/health")
     if response.status_code == 200:
-        print(f"   ✓ Health check passed: {response.json()}")
+        print(f"   ✓ Health check passed: {rjson(response)}")
     else:
         print(f"   ✗ Error: {response.status_code}")
 except Exception as e:
     print(f"   ✗ Connection error: {e}")
 
+SESSION.close()
+AUTH_SESSION.close()
+
 print("\n" + "=" * 50)
 print("Testing complete!")
 print("\nTo enable authentication:")
@@ -4,177 +4,213 @@ Test script for German language PII detection
 Run this after starting the API server
 """
 
+import asyncio
 import requests
 import json
+import orjson
+from test_utils import async_session, ensure_healthy, make_session, warm_up
 
 # API endpoint
 BASE_URL = "http://localhost:8000"
 
-def test_german_auto_detection():
+# Shared session so requests reuse pooled keep-alive connections
+SESSION = make_session()
+
+async def test_german_auto_detection(session):
     """Test automatic German language detection"""
     print("Testing German auto-detection...")
     
-    response = requests.post(
-        f"{BASE_URL}/mask",
+    async with session.post(
+        "/mask",
         json={
             "text": "Mein Name ist Hans Müller und meine E-Mail ist hans@beispiel.de",
             "masking_mode": "replace"
         }
-    )
-    
-    data = response.json()
+    ) as response:
+        assert response.status == 200, f"Unexpected status {response.status}"
+        data = orjson.loads(await response.read())
     print("Response:", json.dumps(data, indent=2, ensure_ascii=False))
     
-    assert response.status_code == 200
     assert data["detected_language"] == "de"
     assert "<PERSON>" in data["masked_text"]
     assert "<EMAIL_ADDRESS>" in data["masked_text"] or "<EMAIL>" in data["masked_text"]
     print("✓ German auto-detection test passed\n")
 
-def test_german_explicit():
-    """Test explicit German language specification"""
-    print("Testing explicit German language...")
+# German inputs sent together through /mask_batch, with a per-text check
+GERMAN_CASES = [
+    {
+        "text": "Der Kunde Max Schmidt wohnt in der Hauptstraße 123, 10115 Berlin. Seine Telefonnummer ist +49 30 12345678.",
+        "expect": ["<PERSON>", "<LOCATION>"]
+    },
+    {
+        "text": "Frau Anna Weber erreichen Sie unter anna.weber@firma.de oder telefonisch unter 030-12345678. Sie arbeitet in der Friedrichstraße 50, 10117 Berlin.",
+        "expect": ["<PERSON>", "<EMAIL_ADDRESS>"]
+    },
+    {
+        "text": "Die Kreditkartennummer ist 4532-1234-5678-9012 und gehört zu Herrn Peter Meier.",
+        "expect": ["<PERSON>"]
+    },
+    {
+        "text": "Kontaktieren Sie Frau Dr. Schmidt unter der Nummer 0171-1234567.",
+        "expect": []
+    }
+]
+
+async def test_german_batch(session):
+    """Test explicit German language for several texts in one batch call"""
+    print("Testing German batch with explicit language...")
     
-    response = requests.post(
-        f"{BASE_URL}/mask",
+    async with session.post(
+        "/mask_batch",
         json={
-            "text": "Der Kunde Max Schmidt wohnt in der Hauptstraße 123, 10115 Berlin. Seine Telefonnummer ist +49 30 12345678.",
-            "masking_mode": "replace",
-            "language": "de"
+            "texts": [case["text"] for case in GERMAN_CASES],
+            "language": "de",
+            "masking_mode": "replace"
         }
-    )
-    
-    data = response.json()
+    ) as response:
+        assert response.status == 200, f"Unexpected status {response.status}"
+        data = orjson.loads(await response.read())
     print("Response:", json.dumps(data, indent=2, ensure_ascii=False))
     
-    assert response.status_code == 200
-    assert data["detected_language"] == "de"
-    assert "<PERSON>" in data["masked_text"]
-    assert "<LOCATION>" in data["masked_text"]
-    print("✓ Explicit German language test passed\n")
+    results = data["results"]
+    assert len(results) == len(GERMAN_CASES)
+    for index, (case, result) in enumerate(zip(GERMAN_CASES, results)):
+        assert result["detected_language"] == "de", f"Text {index}: wrong language"
+        assert len(result["entities_found"]) > 0, f"Text {index}: no entities found"
+        for placeholder in case["expect"]:
+            assert placeholder in result["masked_text"], f"Text {index}: missing {placeholder}"
+    print("✓ German batch test passed\n")
 
-def test_german_with_phone_and_address():
+async def test_german_with_phone_and_address(session):
     """Test German text with phone numbers and addresses"""
     print("Testing German with complex PII...")
     
-    response = requests.post(
-        f"{BASE_URL}/mask",
+    async with session.post(
+        "/mask",
         json={
             "text": "Frau Anna Weber erreichen Sie unter anna.weber@firma.de oder telefonisch unter 030-12345678. Sie arbeitet in der Friedrichstraße 50, 10117 Berlin.",
             "masking_mode": "redact",
             "language": "de"
         }
-    )
-    
-    data = response.json()
+    ) as response:
+        assert response.status == 200, f"Unexpected status {response.status}"
+        data = orjson.loads(await response.read())
     print("Response:", json.dumps(data, indent=2, ensure_ascii=False))
     
-    assert response.status_code == 200
     assert "██████" in data["masked_text"]  # Redacted content
     print("✓ German complex PII test passed\n")
 
-def test_german_credit_card():
-    """Test German text with credit card number"""
+async def test_german_credit_card(session):
+    """Test hash mode on non-ASCII German text with a credit card number"""
     print("Testing German with credit card...")
     
-    response = requests.post(
-        f"{BASE_URL}/mask",
+    async with session.post(
+        "/mask",
         json={
             "text": "Die Kreditkartennummer ist 4532-1234-5678-9012 und gehört zu Herrn Peter Meier.",
             "masking_mode": "hash",
             "language": "de"
         }
-    )
-    
-    data = response.json()
+    ) as response:
+        assert response.status == 200, f"Unexpected status {response.status}"
+        data = orjson.loads(await response.read())
     print("Response:", json.dumps(data, indent=2, ensure_ascii=False))
     
-    assert response.status_code == 200
     assert "<HASH:" in data["masked_text"]  # Hash mode
+    # Non-ASCII text takes the character-offset hashing path
+    assert "gehört" in data["masked_text"]
     print("✓ German credit card test passed\n")
 
-def test_mixed_english_german():
-    """Test mixed English and German text"""
-    print("Testing mixed English/German text...")
-    
-    response = requests.post(
-        f"{BASE_URL}/mask",
-        json={
-            "text": "Hello, my name is John Smith. Ich wohne in München und meine E-Mail ist john@example.com",
-            "masking_mode": "replace"
-        }
-    )
-    
-    data = response.json()
-    print("Response:", json.dumps(data, indent=2, ensure_ascii=False))
-    
-    assert response.status_code == 200
-    assert "<PERSON>" in data["masked_text"]
-    assert "<EMAIL_ADDRESS>" in data["masked_text"] or "<EMAIL>" in data["masked_text"]
-    print("✓ Mixed language test passed\n")
-
-def test_detect_mode_german():
+async def test_detect_mode_german(session):
     """Test detect mode with German text"""
     print("Testing detect mode with German...")
     
-    response = requests.post(
-        f"{BASE_URL}/mask",
+    async with session.post(
+        "/mask",
         json={
             "text": "Kontaktieren Sie Frau Dr. Schmidt unter der Nummer 0171-1234567.",
             "mode": "detect",
             "language": "de"
         }
-    )
-    
-    data = response.json()
+    ) as response:
+        assert response.status == 200, f"Unexpected status {response.status}"
+        data = orjson.loads(await response.read())
     print("Response:", json.dumps(data, indent=2, ensure_ascii=False))
     
-    assert response.status_code == 200
     assert data["masked_text"] == "Kontaktieren Sie Frau Dr. Schmidt unter der Nummer 0171-1234567."
     assert len(data["entities_found"]) > 0
     print("✓ Detect mode German test passed\n")
 
+async def test_mixed_english_german(session):
+    """Test mixed English and German text"""
+    print("Testing mixed English/German text...")
+    
+    async with session.post(
+        "/mask",
+        json={
+            "text": "Hello, my name is John Smith. Ich wohne in München und meine E-Mail ist john@example.com",
+            "masking_mode": "replace"
+        }
+    ) as response:
+        assert response.status == 200, f"Unexpected status {response.status}"
+        data = orjson.loads(await response.read())
+    print("Response:", json.dumps(data, indent=2, ensure_ascii=False))
+    
+    assert "<PERSON>" in data["masked_text"]
+    assert "<EMAIL_ADDRESS>" in data["masked_text"] or "<EMAIL>" in data["masked_text"]
+    print("✓ Mixed language test passed\n")
+
 def main():
     """Run all German language tests"""
-    print("=" * 50)
-    print("Running German Language PII Detection Tests")
-    print("=" * 50 + "\n")
-    
     try:
-        # Check if server is running
-        response = requests.get(f"{BASE_URL}/health")
-        if response.status_code != 200:
-            print("❌ Error: API server is not running!")
-            print("Please start the server with: uvicorn app:app --reload")
-            return
-    except requests.exceptions.ConnectionError:
+        # Check if server is running before doing anything else
+        ensure_healthy(SESSION, BASE_URL)
+    except requests.HTTPError:
+        print("❌ Error: API server is not running!")
+        print("Please start the server with: uvicorn app:app --reload")
+        return
+    except requests.RequestException:
         print("❌ Error: Cannot connect to API server!")
         print("Please start the server with: uvicorn app:app --reload")
         return
+    warm_up(SESSION, BASE_URL, languages=("en", "de"))
     
-    # Run tests
+    print("=" * 50)
+    print("Running German Language PII Detection Tests")
+    print("=" * 50 + "\n")
+    
+    # Run tests concurrently - they are independent, so total time is
+    # roughly that of the slowest test instead of the sum
     tests = [
         test_german_auto_detection,
-        test_german_explicit,
+        test_german_batch,
         test_german_with_phone_and_address,
         test_german_credit_card,
-        test_mixed_english_german,
-        test_detect_mode_german
+        test_detect_mode_german,
+        test_mixed_english_german
     ]
     
+    async def run_tests():
+        async with async_session(base_url=BASE_URL) as session:
+            return await asyncio.gather(
+                *(test(session) for test in tests),
+                return_exceptions=True
+            )
+    
+    outcomes = asyncio.run(run_tests())
+    
     passed = 0
     failed = 0
     
-    for test in tests:
-        try:
-            test()
-            passed += 1
-        except AssertionError as e:
-            print(f"❌ Test {test.__name__} failed: {e}\n")
+    for test, outcome in zip(tests, outcomes):
+        if isinstance(outcome, AssertionError):
+            print(f"❌ Test {test.__name__} failed: {outcome}\n")
             failed += 1
-        except Exception as e:
-            print(f"❌ Test {test.__name__} error: {e}\n")
+        elif isinstance(outcome, Exception):
+            print(f"❌ Test {test.__name__} error: {outcome}\n")
             failed += 1
+        else:
+            passed += 1
     
     print("=" * 50)
     print(f"Test Results: {passed} passed, {failed} failed")
@@ -5,43 +5,72 @@ Tests rate limiting, DoS protection, authentication, and CORS.
 """
 
 import requests
+import json
 import time
 import sys
-import threading
-from requests.auth import HTTPBasicAuth
+import asyncio
+from collections import Counter
+from test_utils import async_session, make_session, rjson, warm_up
 
 API_BASE = "http://localhost:8000"
 
+# Shared session so requests reuse pooled keep-alive connections
+SESSION = make_session()
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Oversized request bodies, built once at import and sent as raw bytes
+LARGE_TEXT_JSON = b'{"text":"' + b"A" * 60_000 + b'","mode":"detect"}'  # Exceeds 50KB default limit
+MEGA_TEXT_JSON = b'{"text":"' + b"X" * 1_200_000 + b'","mode":"detect"}'  # Exceeds 1MB limit
+
 def test_rate_limiting():
-    """Test rate limiting by making many rapid requests."""
+    """Test rate limiting by firing a burst of concurrent requests."""
     print("\n=== Testing Rate Limiting ===")
+    import aiohttp
     
-    # Make rapid requests to trigger rate limiting
-    start_time = time.time()
-    success_count = 0
-    rate_limited_count = 0
+    # Serialize every payload up front so the burst loop only sends bytes
+    payloads = [
+        json.dumps({"text": f"test request {i}", "mode": "detect"}).encode()
+        for i in range(35)  # Exceed the default 30/minute limit
+    ]
     
-    for i in range(35):  # Exceed the default 30/minute limit
-        try:
-            response = requests.post(
-                f"{API_BASE}/mask",
-                json={"text": f"test request {i}", "mode": "detect"},
-                timeout=2
+    async def send_request(session, body):
+        async with session.post(
+            f"{API_BASE}/mask",
+            data=body,
+            headers=JSON_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=2)
+        ) as response:
+            return response.status
+    
+    async def send_burst():
+        # Send the whole burst at once so the server's limiter, not the
+        # client, is the bottleneck
+        async with async_session(limit=35) as session:
+            return await asyncio.gather(
+                *(send_request(session, body) for body in payloads),
+                return_exceptions=True
             )
-            
-            if response.status_code == 200:
-                success_count += 1
-            elif response.status_code == 429:  # Too Many Requests
-                rate_limited_count += 1
-                print(f"  ✓ Rate limit triggered at request {i+1}")
-            else:
-                print(f"  ? Unexpected status {response.status_code} at request {i+1}")
-                
-        except requests.RequestException as e:
-            print(f"  ✗ Request {i+1} failed: {e}")
     
-    elapsed = time.time() - start_time
-    print(f"  Sent 35 requests in {elapsed:.2f}s")
+    start_ns = time.perf_counter_ns()
+    outcomes = asyncio.run(send_burst())
+    elapsed_ns = time.perf_counter_ns() - start_ns
+    
+    # Tally outcomes first and report once, instead of printing per request
+    statuses = Counter(
+        type(outcome).__name__ if isinstance(outcome, Exception) else outcome
+        for outcome in outcomes
+    )
+    success_count = statuses.pop(200, 0)
+    rate_limited_count = statuses.pop(429, 0)  # Too Many Requests
+    
+    if statuses:
+        print(f"  ? Other outcomes: {dict(statuses)}")
+    
+    if rate_limited_count > 0:
+        print(f"  ✓ Rate limit triggered for {rate_limited_count} requests")
+    
+    print(f"  Sent 35 requests in {elapsed_ns / 1e9:.2f}s")
     print(f"  Success: {success_count}, Rate limited: {rate_limited_count}")
     
     if rate_limited_count > 0:
@@ -55,14 +84,16 @@ def test_dos_protection():
     
     # Test 1: Large text payload
     print("Testing large text payload...")
-    large_text = "A" * 60000  # Exceeds 50KB default limit
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE}/mask",
-            json={"text": large_text, "mode": "detect"},
-            timeout=5
+            data=LARGE_TEXT_JSON,
+            headers=JSON_HEADERS,
+            stream=True
         )
+        # Only the status matters - never download the error body
+        response.close()
         
         if response.status_code == 413:
             print("  ✅ Large payload correctly rejected (413)")
@@ -74,14 +105,15 @@ def test_dos_protection():
     
     # Test 2: Very large request size (bytes)
     print("Testing request size limits...")
-    mega_text = "X" * 1200000  # Exceeds 1MB limit
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE}/mask",
-            json={"text": mega_text, "mode": "detect"},
-            timeout=5
+            data=MEGA_TEXT_JSON,
+            headers=JSON_HEADERS,
+            stream=True
         )
+        response.close()
         
         if response.status_code == 413:
             print("  ✅ Mega payload correctly rejected (413)")
@@ -94,14 +126,14 @@ def test_dos_protection():
 def test_authentication_security():
     """Test authentication with various scenarios."""
     print("\n=== Testing Authentication Security ===")
+    from requests.auth import HTTPBasicAuth
     
     # Test 1: No credentials
     print("Testing without credentials...")
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE}/mask",
-            json={"text": "test", "mode": "detect"},
-            timeout=5
+            json={"text": "test", "mode": "detect"}
         )
         
         if response.status_code == 401:
@@ -117,11 +149,10 @@ def test_authentication_security():
     # Test 2: Wrong credentials
     print("Testing with wrong credentials...")
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE}/mask",
             json={"text": "test", "mode": "detect"},
-            auth=HTTPBasicAuth("hacker", "wrong_password"),
-            timeout=5
+            auth=HTTPBasicAuth("hacker", "wrong_password")
         )
         
         if response.status_code == 401:
@@ -137,15 +168,14 @@ def test_authentication_security():
     # Test 3: Correct credentials (if auth enabled)
     print("Testing with correct credentials...")
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE}/mask",
             json={"text": "John Doe", "mode": "detect"},
-            auth=HTTPBasicAuth("admin", "change_me_to_secure_password_123"),
-            timeout=5
+            auth=HTTPBasicAuth("admin", "change_me_to_secure_password_123")
         )
         
         if response.status_code == 200:
-            result = response.json()
+            result = rjson(response)
             print(f"  ✅ Correct credentials accepted - found {len(result.get('entities_found', []))} entities")
         elif response.status_code == 401:
             print("  ❌ Correct credentials rejected - check configuration")
@@ -161,14 +191,13 @@ def test_cors_headers():
     
     # Test preflight request
     try:
-        response = requests.options(
+        response = SESSION.options(
             f"{API_BASE}/mask",
             headers={
                 "Origin": "https://evil-site.com",
                 "Access-Control-Request-Method": "POST",
                 "Access-Control-Request-Headers": "Content-Type"
-            },
-            timeout=5
+            }
         )
         
         cors_origin = response.headers.get("Access-Control-Allow-Origin", "")
@@ -185,85 +214,137 @@ def test_cors_headers():
         print(f"  ✗ CORS test failed: {e}")
 
 def test_concurrent_requests():
-    """Test behavior under concurrent load."""
+    """Test behavior under concurrent load using parallel batch requests."""
     print("\n=== Testing Concurrent Request Handling ===")
+    import aiohttp
     
-    results = []
+    # Serialize every payload up front so timing covers only the requests
+    payloads = [
+        json.dumps({
+            "texts": [f"Test user {request_id}-{i}" for i in range(8)],
+            "mode": "detect"
+        }).encode()
+        for request_id in range(4)
+    ]
     
-    def make_request(request_id):
+    async def make_request(session, request_id):
         try:
-            start = time.time()
-            response = requests.post(
-                f"{API_BASE}/mask",
-                json={"text": f"Test user {request_id}", "mode": "detect"},
-                timeout=10
-            )
-            elapsed = time.time() - start
-            results.append((request_id, response.status_code, elapsed))
-        except requests.RequestException as e:
-            results.append((request_id, f"ERROR: {e}", 0))
+            start_ns = time.perf_counter_ns()
+            async with session.post(
+                f"{API_BASE}/mask_batch",
+                data=payloads[request_id],
+                headers=JSON_HEADERS
+            ) as response:
+                await response.read()
+                return request_id, response.status, time.perf_counter_ns() - start_ns
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return request_id, f"ERROR: {e}", 0
     
-    # Launch concurrent requests
-    threads = []
-    for i in range(10):
-        thread = threading.Thread(target=make_request, args=(i,))
-        threads.append(thread)
-        thread.start()
+    async def run_requests():
+        # One event loop and one keep-alive connection pool for all requests
+        async with async_session(limit=16) as session:
+            return await asyncio.gather(*(make_request(session, i) for i in range(4)))
     
-    # Wait for all to complete
-    for thread in threads:
-        thread.join()
+    # Launch concurrent requests
+    results = asyncio.run(run_requests())
     
     # Analyze results
     success_count = sum(1 for _, status, _ in results if status == 200)
-    avg_time = sum(elapsed for _, status, elapsed in results if status == 200) / max(success_count, 1)
+    avg_ns = sum(elapsed_ns for _, status, elapsed_ns in results if status == 200) / max(success_count, 1)
     
-    print(f"  Concurrent requests: 10")
+    print(f"  Concurrent batch requests: 4 (8 texts each)")
     print(f"  Successful: {success_count}")
-    print(f"  Average response time: {avg_time:.3f}s")
+    print(f"  Average response time: {avg_ns / 1e9:.3f}s")
     
-    if success_count >= 8:  # Allow for some rate limiting
+    if success_count >= 3:  # Allow for some rate limiting
         print("  ✅ Handles concurrent requests well")
     else:
         print("  ⚠️  May have issues with concurrent requests")
 
+def test_batch_mask():
+    """Test the batch endpoint and compare its per-text cost with /mask."""
+    print("\n=== Testing Batch Masking ===")
+    
+    texts = [f"Test user {i}" for i in range(32)]
+    
+    try:
+        # Per-text cost of single requests (kept below the rate limit)
+        single_times = []
+        for text in texts[:8]:
+            start_ns = time.perf_counter_ns()
+            response = SESSION.post(
+                f"{API_BASE}/mask",
+                json={"text": text, "mode": "detect"},
+                timeout=10
+            )
+            if response.status_code == 200:
+                single_times.append(time.perf_counter_ns() - start_ns)
+        
+        # Same work as one batch call
+        start_ns = time.perf_counter_ns()
+        response = SESSION.post(
+            f"{API_BASE}/mask_batch",
+            json={"texts": texts, "mode": "detect"},
+            timeout=30
+        )
+        batch_ns = time.perf_counter_ns() - start_ns
+        
+        if response.status_code != 200:
+            print(f"  ❌ Batch request failed (status: {response.status_code})")
+            return
+        
+        result = rjson(response)
+        if len(result["results"]) == 32:
+            print("  ✅ Batch of 32 texts returned 32 results")
+        else:
+            print(f"  ❌ Batch of 32 texts returned {len(result['results'])} results")
+        
+        per_text_batch = batch_ns / len(texts)
+        print(f"  Batch: {batch_ns / 1e9:.3f}s total, {per_text_batch / 1e6:.1f}ms per text")
+        if single_times:
+            per_text_single = sum(single_times) / len(single_times)
+            print(f"  Single requests: {per_text_single / 1e6:.1f}ms per text")
+            print(f"  Batch speedup per text: {per_text_single / per_text_batch:.1f}x")
+        else:
+            print("  ℹ  Single requests were rate limited - no comparison available")
+        
+    except requests.RequestException as e:
+        print(f"  ✗ Batch test failed: {e}")
+
 def test_health_endpoint():
-    """Test health endpoint accessibility."""
+    """Test health endpoint accessibility. Returns True if the server is healthy."""
     print("\n=== Testing Health Endpoint ===")
     
     try:
-        response = requests.get(f"{API_BASE}/health", timeout=5)
+        # Short timeout: this doubles as the suite's readiness check
+        response = SESSION.get(f"{API_BASE}/health", timeout=1)
         
         if response.status_code == 200:
-            health_data = response.json()
+            health_data = rjson(response)
             print(f"  ✅ Health endpoint accessible: {health_data}")
         else:
             print(f"  ❌ Health endpoint returned {response.status_code}")
+        return response.status_code == 200
             
     except requests.RequestException as e:
         print(f"  ✗ Health endpoint test failed: {e}")
+        print("Please ensure the server is running: uvicorn app:app --reload")
+        return False
 
 def main():
     """Run all security tests."""
-    print("🔒 PII Scrubber API Security Test Suite")
-    print("=" * 50)
-    
-    # Check server availability
-    try:
-        response = requests.get(f"{API_BASE}/health", timeout=5)
-        if response.status_code != 200:
-            print(f"❌ Server not responding properly. Status: {response.status_code}")
-            sys.exit(1)
-    except Exception as e:
-        print(f"❌ Cannot connect to server at {API_BASE}")
-        print("Please ensure the server is running: uvicorn app:app --reload")
+    print(f"Connecting to {API_BASE} ...")
+    if not test_health_endpoint():
         sys.exit(1)
+    warm_up(SESSION, API_BASE)
     
-    print(f"✅ Server is accessible at {API_BASE}")
+    print("\n🔒 PII Scrubber API Security Test Suite")
+    print("=" * 50)
     
-    # Run all tests
-    test_health_endpoint()
+    # Run all tests. The batch comparison needs single /mask calls, so it
+    # runs before the rate-limit burst uses up the /mask budget
     test_authentication_security()
+    test_batch_mask()
     test_rate_limiting()
     test_dos_protection()
     test_cors_headers()
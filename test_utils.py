@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the PII Scrubber API test scripts
+"""
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+
+# Cached /health payload - the answer does not change within a test run
+_HEALTH = None
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to every request it sends"""
+    
+    def __init__(self, *args, timeout=5, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+    
+    def send(self, request, **kwargs):
+        # requests always passes timeout=None when the caller omits it
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+def make_session(pool_size=32, timeout=5):
+    """
+    Create the requests session used by a test script. Requests reuse pooled
+    keep-alive connections and get a default timeout unless they set one.
+    """
+    session = requests.Session()
+    session.mount("http://", TimeoutHTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=0,
+        timeout=timeout
+    ))
+    return session
+
+def rjson(response):
+    """Decode a requests response body with orjson straight from the raw bytes"""
+    return orjson.loads(response.content)
+
+def ensure_healthy(session, base_url, timeout=1):
+    """
+    Return the API's /health payload, probing the server only once per run.
+    Raises requests.RequestException if the server is unreachable or unhealthy.
+    The short default timeout makes a missing server fail fast.
+    """
+    global _HEALTH
+    if _HEALTH is None:
+        response = session.get(f"{base_url}/health", timeout=timeout)
+        response.raise_for_status()
+        _HEALTH = rjson(response)
+    return _HEALTH
+
+# Short per-language inputs that force each spaCy pipeline to load
+_WARMUP_TEXTS = {"en": "warmup", "de": "Aufwärmen"}
+
+def warm_up(session, base_url, languages=("en",)):
+    """
+    Send one throwaway /mask request per language so timed tests run
+    against a hot analyzer. Failures are ignored - the tests report them.
+    """
+    for language in languages:
+        try:
+            session.post(
+                f"{base_url}/mask",
+                json={"text": _WARMUP_TEXTS[language], "mode": "detect", "language": language},
+                timeout=30
+            ).close()
+        except requests.RequestException:
+            pass
+
+def async_session(base_url=None, limit=32):
+    """
+    Create the aiohttp session used by the async tests. All in-flight
+    requests share one keep-alive connection pool.
+    """
+    # Imported lazily so the synchronous scripts do not need aiohttp
+    import aiohttp
+    
+    connector = aiohttp.TCPConnector(limit=limit, force_close=False)
+    return aiohttp.ClientSession(
+        base_url=base_url,
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=10)
+    )